@@ -0,0 +1,81 @@
+"""
+search.py の照合方法ごとの走査時間を比較するベンチマーク
+
+使用方法: python bench_search.py [--size MB] [--repeat N] [キーワード ...]
+
+乱数で作ったテキストファイルを一時ディレクトリに書き出し、numba のオートマトン、
+pyahocorasick のオートマトン、正規表現のそれぞれで scan_file を1プロセスで実行して、
+最も速かった回の時間を表示する（利用できない照合方法は表示しない）。
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import search
+
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'value', 'return', 'self', 'import',
+         'data', 'line', 'error', '処理', '設定', 'ファイル']
+
+def write_corpus(dir_path, size_mb, file_size=1_000_000, seed=0):
+    """約 size_mb MB のテキストファイルを file_size バイトずつに分けて書き出し、パスのリストを返す"""
+    rng = random.Random(seed)
+    paths = []
+    for file_idx in range(max(1, size_mb * 1_000_000 // file_size)):
+        lines = []
+        size = 0
+        while size < file_size:
+            line = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+            lines.append(line)
+            size += len(line.encode('utf-8')) + 1
+        path = os.path.join(dir_path, f'file{file_idx}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        paths.append(path)
+    return paths
+
+def build_matchers(keywords, ignore_case=True):
+    """照合方法の名前 -> build_matcher と同じ形の照合用データ（利用できるものだけ）"""
+    unicode_patterns = search.build_unicode_patterns(keywords, ignore_case)
+    candidates = {
+        'numba': (search.build_byte_automaton(keywords, ignore_case), None, None),
+        'pyahocorasick': (None, search.build_keyword_automaton(keywords, ignore_case), None),
+        're': (None, None, search.build_keyword_pattern(keywords, ignore_case)),
+    }
+    return {name: parts + (unicode_patterns, ignore_case)
+            for name, parts in candidates.items() if any(part is not None for part in parts)}
+
+def time_scan(paths, matcher, repeat):
+    """全ファイルを scan_file で検索し、(最も速かった回の秒数, ヒット数) を返す"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hit_count = sum(len(search.scan_file(path, matcher)) for path in paths)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, hit_count
+
+def main():
+    parser = argparse.ArgumentParser(description='照合方法ごとの走査時間を比較します')
+    parser.add_argument('--size', type=int, default=28, help='テキストファイルの合計サイズ (MB)')
+    parser.add_argument('--repeat', type=int, default=3, help='各照合方法の実行回数')
+    parser.add_argument('keywords', nargs='*', help='検索する語句 (省略時はヒットしない語句とヒットの多い語句で比較)')
+    args = parser.parse_args()
+
+    keyword_sets = [args.keywords] if args.keywords else [
+        ['zzq', 'xyzzy', 'nothere'],
+        ['zzq', 'xyzzy', 'nothere', 'qqq', 'www', 'vvv', 'kkk', 'jjj', 'hhh', 'ggg'],
+        ['error'],
+    ]
+
+    with tempfile.TemporaryDirectory() as dir_path:
+        paths = write_corpus(dir_path, args.size)
+        for keywords in keyword_sets:
+            print(f"キーワード: {', '.join(keywords)}")
+            for name, matcher in build_matchers(keywords).items():
+                elapsed, hit_count = time_scan(paths, matcher, args.repeat)
+                print(f"  {name:15s} {elapsed:7.3f} 秒  (ヒット {hit_count} 件)")
+
+if __name__ == '__main__':
+    main()
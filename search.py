@@ -1,15 +1,52 @@
 #!/usr/bin/env python3
 import os
 import re
+import mmap
+import fnmatch
+import itertools
+from collections import deque
 import argparse
 import sys
+import io
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment, PatternFill
 from openpyxl.styles import Border, Side
 from datetime import datetime
 import openpyxl
 
+# pyahocorasick があれば全キーワードを1回の走査でまとめて照合する（無ければ正規表現で照合）
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# numpy があれば改行位置の探索をベクトル演算で行う
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# numba があればバイト単位の Aho-Corasick 走査をコンパイルして実行する（pyahocorasick より優先）
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# google-re2 があれば、キーワードをまとめた正規表現を RE2 の DFA で照合する（無ければ標準の re）
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 def print_usage():
     """引数なしで実行された場合に表示するヘルプメッセージ"""
     usage = """
@@ -31,6 +68,8 @@ def print_usage():
   -o, --output FILE     結果を指定したファイルに出力します
   -t, --output-type TYPE 出力形式を指定します (excel, csv, text) (デフォルト: excel)
   -s, --stdout          結果を標準出力に表示します (Excelファイルは生成されません)
+  -j, --jobs N          並列に検索するプロセス数を指定します (デフォルト: CPUコア数、1で並列化しない)
+  -a, --include-binary  バイナリファイルも検索します (デフォルトはバイナリファイルを読み飛ばす)
 
 例:
   search.py "検索語句"                      # 単一の語句で検索
@@ -68,6 +107,8 @@ def main():
     parser.add_argument('-t', '--output-type', choices=['excel', 'csv', 'text'], default='excel', 
                         help='出力形式を指定します (デフォルト: excel)')
     parser.add_argument('-s', '--stdout', action='store_true', help='結果を標準出力に表示します')
+    parser.add_argument('-j', '--jobs', type=int, help='並列に検索するプロセス数を指定します (デフォルト: CPUコア数)')
+    parser.add_argument('-a', '--include-binary', action='store_true', help='バイナリファイルも検索します')
     parser.add_argument('search_terms', nargs='+', help='検索する語句（複数指定可能）')
     
     args = parser.parse_args()
@@ -96,6 +137,8 @@ def main():
         recursive=recursive,
         ignore_case=ignore_case,
         file_pattern=args.file_pattern,
+        jobs=args.jobs,
+        include_binary=args.include_binary,
         output_file=None if args.stdout else (output_file if args.output_type != 'excel' else None),
         output_excel=output_file if output_to_file and args.output_type == 'excel' else None
     )
@@ -105,92 +148,618 @@ def main():
         for result in search_results:
             print(result)
 
-def search_files(keywords, base_dir='.', recursive=True, ignore_case=True, file_pattern=None, output_file=None, output_excel=None):
+def encode_keyword(keyword, ignore_case=True):
     """
-    指定ディレクトリ以下のファイルを対象に、指定した単語を検索する
+    キーワードをファイルと同じ UTF-8 のバイト列に変換する
+
+    ファイルはデコードせずにバイト列のまま走査するため、キーワードも検索前に1度だけエンコードしておく。
+    大文字小文字を区別しない場合は ASCII の英字を小文字に揃える
+    （ASCII 以外の大文字小文字を持つキーワードは build_unicode_patterns で別に照合する）。
+    """
+    data = keyword.encode('utf-8')
+    return data.lower() if ignore_case else data
+
+def group_keywords(keywords, ignore_case=True):
+    """
+    照合用に変換した語句ごとにキーワード番号をまとめる
+
+    大文字小文字を区別しない場合に同一視される語句は、まとめて1語として扱う。
+    バイト列の小文字化では同一視できないキーワード（needs_unicode_case_folding）は含めない。
+
+    :return: 語句（encode_keyword で変換したもの） -> キーワード番号のリスト
+    """
+    words = {}
+    for idx, keyword in enumerate(keywords):
+        if ignore_case and needs_unicode_case_folding(keyword):
+            continue
+        word = encode_keyword(keyword, ignore_case)
+        if word:
+            words.setdefault(word, []).append(idx)
+    return words
+
+def needs_unicode_case_folding(keyword):
+    """
+    キーワードが ASCII 以外の大文字小文字を持つ文字（全角英字やアクセント付きの文字など）を含むかどうか
+
+    このようなキーワードはバイト列の小文字化（ASCII のみ）では大文字小文字を同一視できない。
+    """
+    return any(not ch.isascii() and ch.lower() != ch.upper() for ch in keyword)
+
+def build_unicode_patterns(keywords, ignore_case=True):
+    """
+    ASCII 以外の大文字小文字を持つキーワードを、文字列として大文字小文字を区別せずに照合する正規表現を構築する
 
     :param keywords: 検索する単語のリスト
-    :param base_dir: 検索対象の基準ディレクトリ
-    :param recursive: サブディレクトリを再帰的に検索するかどうか
     :param ignore_case: 大文字小文字を区別しないかどうか
-    :param file_pattern: 検索対象のファイルパターン（例：*.txt）
-    :param output_file: 結果を保存するテキストファイル（Noneの場合は標準出力）
-    :param output_excel: 結果をExcelファイルとして保存するパス
+    :return: (正規表現, キーワード番号) のリスト（対象のキーワードが無い場合は空のリスト）
     """
-    # 大文字小文字を区別しない場合はre.IGNORECASEフラグを使用
-    flags = re.IGNORECASE if ignore_case else 0
-    keyword_patterns = [re.compile(rf'\b{re.escape(keyword)}\b', flags) for keyword in keywords]
+    if not ignore_case:
+        return []
+    return [(re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE), idx)
+            for idx, keyword in enumerate(keywords) if needs_unicode_case_folding(keyword)]
 
-    # ファイルパターンがある場合は正規表現に変換
-    file_pattern_regex = None
-    if file_pattern:
-        # ワイルドカード（*）を正規表現に変換
-        pattern = file_pattern.replace('.', '\\.').replace('*', '.*')
-        file_pattern_regex = re.compile(f'^{pattern}$', re.IGNORECASE)
+def build_keyword_automaton(keywords, ignore_case=True):
+    """
+    全キーワードを同時に照合する Aho-Corasick オートマトンを構築する
 
-    results = {keyword: {'hit_count': 0, 'file_count': 0, 'files': {}} for keyword in keywords}
-    excel_data = []
+    :param keywords: 検索する単語のリスト
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :return: オートマトン（pyahocorasick が利用できない場合は None）
+    """
+    if ahocorasick is None:
+        return None
 
-    # 現在のスクリプトファイル名を取得
-    current_script = os.path.basename(__file__)
+    words = group_keywords(keywords, ignore_case)
+    if not words:
+        return None
+
+    # pyahocorasick は文字列しか扱えないため、バイト列を latin-1 として読み替えて登録する（1文字 = 1バイト）
+    automaton = ahocorasick.Automaton()
+    for word, indexes in words.items():
+        automaton.add_word(word.decode('latin-1'), (len(word), indexes))
+    automaton.make_automaton()
+    return automaton
+
+# バイト単位のオートマトンの状態数の上限（遷移表は 状態数 x 256 の int32 配列になる）
+BYTE_AUTOMATON_MAX_STATES = 65536
+# バイト単位のオートマトンで走査するときに、最初に確保する結果の配列の長さの最小値
+# （通常はファイルの 128 バイトにつき1件分を確保する）
+BYTE_AUTOMATON_INITIAL_CAPACITY = 4096
+
+def build_byte_automaton(keywords, ignore_case=True):
+    """
+    全キーワードを同時に照合するバイト単位の Aho-Corasick オートマトンを numpy 配列として構築する
+
+    失敗遷移をあらかじめ遷移表に畳み込んでおくことで、走査は1バイトにつき表を1回引くだけになる。
+    大文字小文字を区別しない場合は、ASCII の大文字の遷移を小文字と同じにする（走査前の小文字化が不要）。
+
+    :param keywords: 検索する単語のリスト
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :return: (遷移表, 状態ごとの語句番号, 出力リンク, 語句番号 -> (語句の長さ, キーワード番号のリスト))
+             （numba が利用できない場合や状態数が多すぎる場合は None）
+    """
+    if njit is None:
+        return None
+
+    words = group_keywords(keywords, ignore_case)
+    if not words or sum(len(word) for word in words) >= BYTE_AUTOMATON_MAX_STATES:
+        return None
+
+    # キーワードの木（トライ）を作る
+    children = [{}]
+    word_at = [-1]
+    word_info = []
+    for word, indexes in words.items():
+        state = 0
+        for byte in word:
+            next_state = children[state].get(byte)
+            if next_state is None:
+                next_state = len(children)
+                children[state][byte] = next_state
+                children.append({})
+                word_at.append(-1)
+            state = next_state
+        word_at[state] = len(word_info)
+        word_info.append((len(word), indexes))
+
+    # 幅優先で失敗遷移を求め、遷移表に畳み込む
+    # dict_link は、失敗遷移をたどって最初に見つかる語句の終端状態（見つからなければ -1）
+    state_count = len(children)
+    delta = np.zeros((state_count, 256), dtype=np.int32)
+    fail = [0] * state_count
+    dict_link = np.full(state_count, -1, dtype=np.int32)
+    queue = deque()
+    for byte, child in children[0].items():
+        delta[0, byte] = child
+        queue.append(child)
+    while queue:
+        state = queue.popleft()
+        delta[state] = delta[fail[state]]
+        for byte, child in children[state].items():
+            child_fail = delta[fail[state], byte] if state else 0
+            fail[child] = child_fail
+            dict_link[child] = child_fail if word_at[child_fail] >= 0 else dict_link[child_fail]
+            delta[state, byte] = child
+            queue.append(child)
+
+    if ignore_case:
+        delta[:, ord('A'):ord('Z') + 1] = delta[:, ord('a'):ord('z') + 1]
+    word_at = np.array(word_at, dtype=np.int32)
+
+    # 最初の呼び出しでコンパイルが行われるため、ファイルを走査する前に空のバイト列で1度実行しておく
+    # （コンパイル中に引数の配列への参照が残り、メモリマップを閉じられなくなるのを避ける）
+    scan_byte_automaton(np.frombuffer(b'', dtype=np.uint8), delta, word_at, dict_link,
+                        np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32))
+
+    return delta, word_at, dict_link, word_info
+
+def scan_byte_automaton(data, delta, word_at, dict_link, out_ends, out_ids):
+    """
+    build_byte_automaton で構築したオートマトンでバイト列を走査する（numba でコンパイルして実行する）
+
+    結果は呼び出し側で確保した配列に書き込む（ループ内で配列を確保し直すとコンパイル結果が大幅に遅くなる）。
+    配列に収まらない分は書き込まずに数えるだけなので、戻り値が配列の長さを超えた場合は
+    その長さの配列を確保して走査し直す。
+
+    :param data: 走査するバイト列（numpy の uint8 配列）
+    :param out_ends: 語句の終了位置（語句の最後のバイトの位置）を書き込む配列
+    :param out_ids: 語句番号を書き込む配列
+    :return: 見つかった語句の数
+    """
+    capacity = out_ends.shape[0]
+    count = 0
+    state = 0
+    for i in range(data.shape[0]):
+        state = delta[state, data[i]]
+        out = state if word_at[state] >= 0 else dict_link[state]
+        while out >= 0:
+            if count < capacity:
+                out_ends[count] = i
+                out_ids[count] = word_at[out]
+            count += 1
+            out = dict_link[out]
+    return count
+
+if njit is not None:
+    # コンパイル結果はディスクにキャッシュし、2回目以降の起動やワーカープロセスでは再コンパイルしない
+    scan_byte_automaton = njit(cache=True, nogil=True)(scan_byte_automaton)
+
+# 正規表現で照合する前に、語句ごとの部分列検索で絞り込む語句の数の上限
+PREFILTER_MAX_WORDS = 8
+
+def build_keyword_pattern(keywords, ignore_case=True):
+    """
+    全キーワードを1つの正規表現（選択 | ）にまとめ、1回の走査で照合できるようにする
+
+    選択は長い語句を優先して並べる。同じ位置から始まる短い語句は長い語句の前方部分に
+    一致するため、一致したグループごとにその位置で成立する語句の一覧を用意しておく。
+
+    :param keywords: 検索する単語のリスト
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :return: (正規表現, グループ番号 -> [(語句の長さ, キーワード番号のリスト), ...],
+              前段の絞り込みに使う語句のリスト（絞り込まない場合は None））
+             （照合する語句が無い場合は None）
+    """
+    words = group_keywords(keywords, ignore_case)
+    if not words:
+        return None
+    ordered = sorted(words, key=len, reverse=True)
+
+    # グループ番号は 1 から始まるため、先頭は空けておく
+    # 語句ごとに自身の前方部分（長い順）のうち語句として登録されているものを集める（語句どうしの総当たりはしない）
+    candidates = [None]
+    for word in ordered:
+        candidates.append([(n, words[word[:n]]) for n in range(len(word), 0, -1) if word[:n] in words])
 
-    # 再帰的に検索するかどうかで処理を分ける
-    if recursive:
-        walk_func = os.walk
+    pattern = None
+    if re2 is not None:
+        try:
+            pattern = re2.compile(join_alternatives(ordered, re2.escape))
+        except re2.error:
+            # 語句が多すぎて RE2 のメモリ上限を超えた場合などは標準の re で照合する
+            pattern = None
+    if pattern is not None:
+        # RE2 は語句の数によらず1回の走査で照合するため、語句ごとの絞り込みはかえって遅くなる
+        return pattern, candidates, None
+
+    pattern = re.compile(join_alternatives(ordered, re.escape))
+    # 語句ごとの絞り込みは語句の数だけファイルを走査するため、語句が少ない場合に限る
+    return pattern, candidates, ordered if len(ordered) <= PREFILTER_MAX_WORDS else None
+
+def join_alternatives(words, escape):
+    """
+    語句ごとにグループ（1, 2, ...）を付けた選択の正規表現を組み立てる
+
+    :param words: 語句（バイト列）のリスト
+    :param escape: 正規表現エンジンのエスケープ関数（re.escape または re2.escape）
+    """
+    return b'|'.join(b'(' + escape(word) + b')' for word in words)
+
+# ASCII の各バイトが単語構成文字（英数字とアンダースコア）かどうかの表
+ASCII_WORD_CHARS = [chr(byte).isalnum() or byte == 0x5F for byte in range(0x80)]
+
+def is_word_char(ch):
+    """正規表現の \\w と同様に、英数字（かな・漢字を含む）とアンダースコアを単語構成文字とみなす"""
+    return ch.isalnum() or ch == '_'
+
+def char_before(buf, pos):
+    """UTF-8 のバイト列 buf で、pos の直前にある1文字を返す（先頭の場合は空文字列）"""
+    start = pos - 1
+    # 継続バイト（0x80～0xBF）をさかのぼって文字の先頭バイトを探す
+    while start > 0 and pos - start < 4 and 0x80 <= buf[start] < 0xC0:
+        start -= 1
+    return buf[max(start, 0):pos].decode('utf-8', 'ignore')
+
+def char_at(buf, pos):
+    """UTF-8 のバイト列 buf で、pos から始まる1文字を返す（末尾の場合は空文字列）"""
+    end = pos + 1
+    while end < len(buf) and end - pos < 4 and 0x80 <= buf[end] < 0xC0:
+        end += 1
+    return buf[pos:end].decode('utf-8', 'ignore')
+
+def is_word_boundary(buf, pos):
+    """
+    UTF-8 のバイト列 buf の pos の位置が単語境界（正規表現の \\b）かどうか
+
+    隣のバイトが ASCII の場合は表を引くだけで判定し、ASCII 以外の場合だけ1文字を切り出してデコードする。
+    """
+    before = False
+    if pos > 0:
+        byte = buf[pos - 1]
+        before = ASCII_WORD_CHARS[byte] if byte < 0x80 else is_word_char(char_before(buf, pos))
+    after = False
+    if pos < len(buf):
+        byte = buf[pos]
+        after = ASCII_WORD_CHARS[byte] if byte < 0x80 else is_word_char(char_at(buf, pos))
+    return before != after
+
+def find_newlines(buf):
+    """
+    バッファ内の改行のバイト位置を昇順に返す
+
+    テキストモードの readlines と同様に \\n、\\r\\n、\\r のいずれも改行とみなす
+    （\\r\\n は \\n の位置を改行とし、\\r は行末に残る）。
+    """
+    if np is not None:
+        data = np.frombuffer(buf, dtype=np.uint8)
+        breaks = data == 10
+        # \r を含むファイルの場合だけ、後ろに \n が続かない \r も改行に加える
+        if buf.find(b'\r') >= 0:
+            lone_cr = data == 13
+            lone_cr[:-1] &= data[1:] != 10
+            breaks |= lone_cr
+        # 二分探索や行の切り出しで1件ずつ参照するため、numpy の配列より速く参照できるリストで返す
+        return np.flatnonzero(breaks).tolist()
+    return [m.start() for m in re.finditer(b'\r(?!\n)|\n', buf)]
+
+def line_span(newlines, line_idx, size):
+    """行インデックス line_idx の行の (開始位置, 終了位置) を返す（終了位置は改行を含まない）"""
+    start = newlines[line_idx - 1] + 1 if line_idx > 0 else 0
+    end = newlines[line_idx] if line_idx < len(newlines) else size
+    return int(start), int(end)
+
+def decode_text(data):
+    """ファイルから切り出したバイト列を文字列に変換する（改行コードは \\n に揃える）"""
+    return data.decode('utf-8', 'ignore').replace('\r\n', '\n').replace('\r', '\n').strip()
+
+def find_keyword_lines(buf, newlines, matcher):
+    """
+    ファイル全体を1回だけ走査し、キーワードが単語として現れる行を求める
+
+    :param buf: ファイル内容のバイト列（mmap）
+    :param newlines: find_newlines で求めた改行位置
+    :param matcher: build_matcher で構築した照合用データ
+    :return: (行インデックス, キーワード番号) のソート済みリスト
+    """
+    byte_automaton, automaton, keyword_pattern, unicode_patterns, ignore_case = matcher
+
+    if byte_automaton is not None:
+        # コンパイル済みのオートマトンはメモリマップをそのまま走査する（大文字小文字の同一視は遷移表で行う）
+        delta, word_at, dict_link, word_info = byte_automaton
+        data = np.frombuffer(buf, dtype=np.uint8)
+        capacity = max(BYTE_AUTOMATON_INITIAL_CAPACITY, len(data) // 128)
+        while True:
+            ends = np.empty(capacity, dtype=np.int64)
+            ids = np.empty(capacity, dtype=np.int32)
+            count = scan_byte_automaton(data, delta, word_at, dict_link, ends, ids)
+            if count <= capacity:
+                break
+            # 結果が配列に収まらなかった場合は、必要な長さの配列で走査し直す
+            capacity = count
+        matches = ((end + 1 - word_info[word_id][0], end + 1, word_info[word_id][1])
+                   for end, word_id in zip(ends[:count].tolist(), ids[:count].tolist()))
+    elif automaton is not None or keyword_pattern is not None:
+        # 大文字小文字を区別しない場合だけ小文字に揃えた写しを作り、区別する場合はメモリマップをそのまま走査する
+        haystack = buf[:].lower() if ignore_case else buf
+        if automaton is not None:
+            # オートマトンはバイト位置と文字位置が一致するよう latin-1 として読み替えた文字列を走査する
+            matches = ((end - length + 1, end + 1, indexes)
+                       for end, (length, indexes) in automaton.iter(str(haystack, 'latin-1')))
+        else:
+            matches = iter_pattern_matches(haystack, keyword_pattern)
     else:
-        # 非再帰的な場合は現在のディレクトリのみを処理する関数を作成
-        def walk_func(dir_path):
-            try:
-                files = [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))]
-                yield dir_path, [], files
-            except Exception as e:
-                print(f"ディレクトリの読み込みエラー: {e}")
+        matches = ()
+
+    hits = set()
+    size = len(buf)
+    # 直前のヒット位置の行（ヒットは行順に近い順で届くため、同じ行なら二分探索を省く）
+    line_idx = -1
+    line_start, line_end = 0, -1
+    for start, end, indexes in matches:
+        if not line_start <= start <= line_end:
+            # 改行位置の一覧を二分探索して、ヒット位置を行インデックスに変換する
+            line_idx = bisect_right(newlines, start)
+            line_start, line_end = line_span(newlines, line_idx, size)
+        # ヒットは行ごとにキーワード1件として数えるため、この行で既にヒットしたキーワードは境界を調べない
+        if all((line_idx, idx) in hits for idx in indexes):
+            continue
+        if not (is_word_boundary(buf, start) and is_word_boundary(buf, end)):
+            continue
+        for idx in indexes:
+            hits.add((line_idx, idx))
+
+    if unicode_patterns:
+        hits.update(find_unicode_keyword_lines(buf, unicode_patterns))
+    return sorted(hits)
+
+def find_unicode_keyword_lines(buf, unicode_patterns):
+    """
+    build_unicode_patterns で構築した正規表現で、ファイルを文字列に変換して照合する
+
+    :param buf: ファイル内容のバイト列（mmap）
+    :param unicode_patterns: (正規表現, キーワード番号) のリスト
+    :return: (行インデックス, キーワード番号) のリスト
+    """
+    # デコードで取り除かれるのは不正なバイト列だけで改行は残るため、文字列の改行位置から行インデックスが求まる
+    text = buf[:].decode('utf-8', 'ignore')
+    text_newlines = [m.start() for m in re.finditer('\r(?!\n)|\n', text)]
+    return [(bisect_right(text_newlines, m.start()), idx)
+            for pattern, idx in unicode_patterns for m in pattern.finditer(text)]
+
+def iter_pattern_matches(haystack, keyword_pattern):
+    """正規表現でキーワードの出現位置を (開始位置, 終了位置, キーワード番号のリスト) として列挙する（重なりも含む）"""
+    pattern, candidates, prefilter_words = keyword_pattern
+
+    # 前段の絞り込み: 語句をそのままバイト列として探し（正規表現より高速な部分列検索）、
+    # どの語句も含まないファイルでは正規表現を実行しない。含む場合も最初の出現位置から照合を始める
+    start = 0
+    if prefilter_words is not None:
+        start = -1
+        for word in prefilter_words:
+            # 既に見つかっている位置より前から始まる出現だけを探す
+            pos = haystack.find(word) if start < 0 else haystack.find(word, 0, start + len(word) - 1)
+            if pos >= 0:
+                start = pos
+                # 先頭で見つかればそれより前は無い
+                if start == 0:
+                    break
+        if start < 0:
+            return
+
+    search = pattern.search
+    m = search(haystack, start)
+    while m:
+        start = m.start()
+        for length, indexes in candidates[m.lastindex]:
+            yield start, start + length, indexes
+        # 次の位置から探し直し、重なって出現する語句も取りこぼさない
+        m = search(haystack, start + 1)
+
+# 拡張子だけでバイナリファイルと判断し、開かずに読み飛ばすファイルの拡張子
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.jar',
+    '.xlsx', '.xls', '.docx', '.doc', '.pptx', '.ppt', '.pdf',
+    '.so', '.dll', '.exe', '.o', '.a', '.pyc', '.class',
+})
+
+# ファイル先頭のこのバイト数の中に NUL 文字があればバイナリファイルとみなす（grep -I と同様）
+BINARY_CHECK_SIZE = 8192
+
+def scan_file(file_path, matcher, include_binary=False):
+    """
+    1つのファイルを検索し、ヒットした行の情報を返す
+
+    ファイルはメモリマップして走査し、ヒットした行とその前後2行だけを文字列に変換する。
+
+    :param file_path: 検索するファイルのパス
+    :param matcher: build_matcher で構築した照合用データ
+    :param include_binary: バイナリファイル（先頭に NUL 文字を含むファイル）も検索するかどうか
+    :return: (キーワード番号, 行番号, ヒットした行, 前後2行を含む全文) のリスト（行順）
+    """
+    with open(file_path, 'rb') as f:
+        # 空のファイルはメモリマップできない（ヒットもしない）
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            # バイナリファイルは検索しない
+            if not include_binary and buf.find(b'\x00', 0, BINARY_CHECK_SIZE) >= 0:
+                return []
+
+            size = len(buf)
+            newlines = find_newlines(buf)
+            last_line = len(newlines)
+
+            hits = []
+            texts_line = None
+            for i, idx in find_keyword_lines(buf, newlines, matcher):
+                # ヒットは行順に並ぶため、同じ行に複数のキーワードがヒットした場合は直前に切り出した文字列を使い回す
+                if i != texts_line:
+                    texts_line = i
+
+                    # ヒットした行の文字列
+                    line_start, line_end = line_span(newlines, i, size)
+                    hit_line = decode_text(buf[line_start:line_end])
+
+                    # ヒットした行の前後2行を取得（折り返し表示用）
+                    context_start = line_span(newlines, max(i - 2, 0), size)[0]
+                    context_end = line_span(newlines, min(i + 2, last_line), size)[1]
+                    full_context = decode_text(buf[context_start:context_end])
+
+                hits.append((idx, i + 1, hit_line, full_context))
+            return hits
+
+# 並列検索の各ワーカープロセスで1度だけ構築する照合用データ（build_matcher の戻り値）
+worker_matcher = None
+# 並列検索の各ワーカープロセスでバイナリファイルも検索するかどうか
+worker_include_binary = False
+
+def build_matcher(keywords, ignore_case=True):
+    """
+    scan_file に渡す照合用データを構築する
+
+    照合方法は numba でコンパイルしたオートマトン、pyahocorasick のオートマトン、
+    全キーワードをまとめた正規表現の順に、利用できるものを1つだけ使う。
+    ASCII 以外の大文字小文字を持つキーワードは、大文字小文字を区別しない場合に限り文字列の正規表現で別に照合する。
+
+    :return: (バイト単位のオートマトン, オートマトン, 正規表現, 文字列の正規表現のリスト, ignore_case)
+             （使わないものは None）
+    """
+    byte_automaton = build_byte_automaton(keywords, ignore_case)
+    automaton = build_keyword_automaton(keywords, ignore_case) if byte_automaton is None else None
+    keyword_pattern = (build_keyword_pattern(keywords, ignore_case)
+                       if byte_automaton is None and automaton is None else None)
+    unicode_patterns = build_unicode_patterns(keywords, ignore_case)
+    return byte_automaton, automaton, keyword_pattern, unicode_patterns, ignore_case
+
+def init_worker(keywords, ignore_case=True, include_binary=False):
+    """ワーカープロセスの初期化処理（照合用データをプロセスごとに1度だけ構築する）"""
+    global worker_matcher, worker_include_binary
+    worker_matcher = build_matcher(keywords, ignore_case)
+    worker_include_binary = include_binary
+
+def scan_file_in_worker(file_path):
+    """
+    ワーカープロセスで1つのファイルを検索する
+
+    :return: (scan_file の結果, エラーメッセージ)（読み込めなかった場合は結果が None）
+    """
+    try:
+        return scan_file(file_path, worker_matcher, worker_include_binary), None
+    except OSError as e:
+        return None, str(e)
+
+def scan_chunk_in_worker(file_paths):
+    """ワーカープロセスで複数のファイルを順に検索し、scan_file_in_worker の結果のリストを返す"""
+    return [scan_file_in_worker(file_path) for file_path in file_paths]
 
-    for root, _, files in walk_func(base_dir):
-        for file in files:
-            # スクリプト自身を除外
-            if file == current_script:
-                continue
+def scan_files(file_paths, keywords, ignore_case=True, jobs=None, include_binary=False):
+    """
+    複数のファイルを検索し、scan_file_in_worker の結果をファイルの順に返す
+
+    ファイルごとの検索は互いに独立しているため、複数のプロセスで並列に実行する。
+    並列に実行する場合も、読み出されていない結果が溜まりすぎないよう、先行して投入するファイルの塊は
+    プロセス数の2倍までに抑える（executor.map は全ファイルを最初に投入し、結果を読み出されるまで保持する）。
+
+    :param file_paths: 検索するファイルのパスのリスト
+    :param keywords: 検索する単語のリスト
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :param jobs: 並列に検索するプロセス数（None の場合は CPU コア数、1 の場合は並列化しない）
+    :param include_binary: バイナリファイルも検索するかどうか
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(file_paths) > 1:
+        # プロセス間の受け渡し回数を抑えるため、ファイルをまとめてワーカーに渡す
+        chunksize = max(1, min(32, len(file_paths) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(keywords, ignore_case, include_binary)) as executor:
+            pending = deque()
+            for i in range(0, len(file_paths), chunksize):
+                pending.append(executor.submit(scan_chunk_in_worker, file_paths[i:i + chunksize]))
+                if len(pending) >= jobs * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    else:
+        init_worker(keywords, ignore_case, include_binary)
+        for file_path in file_paths:
+            yield scan_file_in_worker(file_path)
 
-            # ファイルパターンが指定されている場合、一致するファイルのみ処理
-            if file_pattern_regex and not file_pattern_regex.match(file):
-                continue
+def walk_files(base_dir, recursive=True, file_pattern=None, include_binary=False, errors=None):
+    """
+    指定ディレクトリ以下の検索対象ファイルを (パス, 基準ディレクトリからの相対パス) として列挙する
 
-            file_path = os.path.join(root, file)
-            relative_file_path = os.path.relpath(file_path, base_dir)  # 相対パスを取得し、"./"を除去
+    os.scandir が返すエントリの種別情報を使い、ファイルごとの stat 呼び出しを省く。
+    ファイルパターンと、拡張子からバイナリファイルと分かるファイルは、ファイルを開く前にファイル名で判定する。
+    列挙するパスは必ず base_dir で始まるため、相対パスは先頭を切り取るだけで求める（os.path.relpath を使わない）。
+
+    :param base_dir: 検索対象の基準ディレクトリ
+    :param recursive: サブディレクトリを再帰的に検索するかどうか
+    :param file_pattern: 検索対象のファイルパターン（例：*.txt、大文字小文字は区別しない）
+    :param include_binary: 拡張子がバイナリファイルのものも列挙するかどうか
+    :param errors: 読み込めなかったディレクトリの (パス, エラーメッセージ) を追加するリスト（None の場合はその場で表示する）
+    """
+    # ファイルパターンは1度だけ正規表現に変換しておく
+    file_pattern_regex = re.compile(fnmatch.translate(file_pattern), re.IGNORECASE) if file_pattern else None
+
+    # base_dir の後ろに区切り文字を付けた長さ（"." の場合は "./" を除いた相対パスになる）
+    prefix_len = len(os.path.join(base_dir, ''))
+
+    stack = [base_dir]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    # シンボリックリンクのディレクトリはたどらない（os.walk と同じ）
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        # ファイルパターンが指定されている場合、一致するファイルのみ処理
+                        if file_pattern_regex and not file_pattern_regex.match(entry.name):
+                            continue
+                        # 拡張子からバイナリファイルと分かるものは開かずに読み飛ばす
+                        if not include_binary and os.path.splitext(entry.name)[1].lower() in BINARY_EXTENSIONS:
+                            continue
+                        path = entry.path
+                        yield path, path[prefix_len:]
+        except OSError as e:
+            if errors is None:
+                print(f"ディレクトリの読み込みエラー: {e}")
+            else:
+                errors.append((dir_path, str(e)))
 
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
+def search_files(keywords, base_dir='.', recursive=True, ignore_case=True, file_pattern=None, output_file=None, output_excel=None, jobs=None, include_binary=False):
+    """
+    指定ディレクトリ以下のファイルを対象に、指定した単語を検索する
 
-                file_hits = {keyword: 0 for keyword in keywords}
-                file_results = {keyword: [] for keyword in keywords}
+    :param keywords: 検索する単語のリスト
+    :param base_dir: 検索対象の基準ディレクトリ
+    :param recursive: サブディレクトリを再帰的に検索するかどうか
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :param file_pattern: 検索対象のファイルパターン（例：*.txt）
+    :param output_file: 結果を保存するテキストファイル（Noneの場合は標準出力）
+    :param output_excel: 結果をExcelファイルとして保存するパス
+    :param jobs: 並列に検索するプロセス数（None の場合は CPU コア数）
+    :param include_binary: バイナリファイルも検索するかどうか
+    """
+    results = {keyword: {'hit_count': 0, 'file_count': 0, 'files': {}} for keyword in keywords}
 
-                for i, line in enumerate(lines):
-                    for keyword, pattern in zip(keywords, keyword_patterns):
-                        if pattern.search(line):
-                            results[keyword]['hit_count'] += 1
-                            file_hits[keyword] += 1
+    # 読み込めなかったディレクトリやファイルの (パス, エラーメッセージ)
+    # 1件ずつ表示せずに溜めておき、検索の終了後にまとめて標準エラー出力へ書き出す
+    errors = []
 
-                            # ヒットした行の文字列
-                            hit_line = line.strip()
+    # 現在のスクリプトファイル名を取得
+    current_script = os.path.basename(__file__)
 
-                            # ヒットした行の前後2行を取得（折り返し表示用）
-                            start = max(i - 2, 0)
-                            end = min(i + 3, len(lines))  # ヒットした行 + 2行まで
-                            full_context = "".join(lines[start:end]).strip()
+    # スクリプト自身を除外
+    files = [(path, relative_path) for path, relative_path in walk_files(base_dir, recursive, file_pattern, include_binary, errors)
+             if os.path.basename(path) != current_script]
 
-                            file_results[keyword].append(f"{relative_file_path} (Line {i+1}): {hit_line}")
-                            excel_data.append([keyword, relative_file_path, i + 1, hit_line, full_context])
+    # ファイルを相対パスの順に検索し、Excel の詳細行が最終的な並び順のまま届くようにする
+    files.sort(key=lambda file: file[1])
 
-                # ファイルごとのヒットを記録
-                for keyword in keywords:
-                    if file_hits[keyword] > 0:
-                        results[keyword]['file_count'] += 1
-                        results[keyword]['files'][relative_file_path] = file_results[keyword]
+    # 詳細行は1件ずつ Excel ファイルへ書き出し、全件をメモリに溜めない
+    # （集計結果 results は詳細行を最後まで読み進めた時点で揃う。
+    # ただしテキストの結果に使うヒットした行は results に全件残る）
+    excel_rows = iter_search_rows(files, keywords, results, errors, ignore_case, jobs, include_binary)
+    if output_excel:
+        save_results_to_excel(output_excel, results, excel_rows)
+    else:
+        deque(excel_rows, maxlen=0)
 
-            except Exception as e:
-                print(f"エラー: {file_path} を読み込めませんでした - {e}")
+    if errors:
+        sys.stderr.write('\n'.join(f"エラー: {path} を読み込めませんでした - {message}" for path, message in errors) + '\n')
 
     output_lines = []
 
@@ -214,28 +783,103 @@ def search_files(keywords, base_dir='.', recursive=True, ignore_case=True, file_
     else:
         print(result_text)
 
-    if output_excel:
-        save_results_to_excel(output_excel, results, excel_data)
-
     return result_text.splitlines()
 
-def save_results_to_excel(output_excel, results, excel_data):
+def iter_search_rows(files, keywords, results, errors, ignore_case=True, jobs=None, include_binary=False):
+    """
+    ファイルを検索し、Excel の詳細行（[キーワード, ファイルパス, 行番号, ヒットした行, 前後2行を含む全文]）を列挙する
+
+    詳細行はファイルの順、ファイル内ではキーワードの順（同じキーワードは行順）に返す。
+    列挙しながら、キーワードごとのヒット数と該当ファイルを results に集計する。
+
+    :param files: 検索するファイルの (パス, 相対パス) のリスト
+    :param keywords: 検索する単語のリスト
+    :param results: 集計先（キーワード -> {'hit_count', 'file_count', 'files'}）
+    :param errors: 読み込めなかったファイルの (パス, エラーメッセージ) を追加するリスト
+    :param ignore_case: 大文字小文字を区別しないかどうか
+    :param jobs: 並列に検索するプロセス数（None の場合は CPU コア数）
+    :param include_binary: バイナリファイルも検索するかどうか
+    """
+    file_paths = [path for path, _ in files]
+    for (file_path, relative_file_path), (hits, error) in zip(files, scan_files(file_paths, keywords, ignore_case, jobs, include_binary)):
+        if error is not None:
+            errors.append((file_path, error))
+            continue
+
+        file_hits = {keyword: 0 for keyword in keywords}
+        file_results = {keyword: [] for keyword in keywords}
+
+        # ヒットは行順に並んでいるため、キーワードで安定ソートすればキーワードごとに行順となる
+        for idx, line_no, hit_line, full_context in sorted(hits, key=lambda hit: keywords[hit[0]]):
+            keyword = keywords[idx]
+            results[keyword]['hit_count'] += 1
+            file_hits[keyword] += 1
+
+            file_results[keyword].append(f"{relative_file_path} (Line {line_no}): {hit_line}")
+            yield [keyword, relative_file_path, line_no, hit_line, full_context]
+
+        # ファイルごとのヒットを記録
+        for keyword in keywords:
+            if file_hits[keyword] > 0:
+                results[keyword]['file_count'] += 1
+                results[keyword]['files'][relative_file_path] = file_results[keyword]
+
+# 共有文字列テーブル（xl/sharedStrings.xml）をブックに組み込むための XML 断片
+SHARED_STRINGS_PART = 'xl/sharedStrings.xml'
+SHEET_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+SHARED_STRINGS_CONTENT_TYPE = (
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+SHARED_STRINGS_RELATIONSHIP = (
+    '<Relationship Id="rId{rel_id}" Target="sharedStrings.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>'
+)
+
+def save_results_to_excel(output_excel, results, excel_rows):
     """
     検索結果を Excel ファイルとして保存する
 
     :param output_excel: 保存する Excel ファイル名
-    :param results: 各キーワードのヒット数とファイル数のデータ
-    :param excel_data: 詳細情報リスト（[キーワード, ファイルパス, 行番号, ヒットした行, 前後2行を含む全文]）
+    :param results: 各キーワードのヒット数とファイル数のデータ（excel_rows を最後まで読み進めた時点で揃っていること）
+    :param excel_rows: 詳細行（[キーワード, ファイルパス, 行番号, ヒットした行, 前後2行を含む全文]）の列挙。
+                       ファイルパスとキーワードの順に並んでいること
     """
-    wb = Workbook()
+    # 書き込み専用モードで行をそのままファイルへ流し込む（セルオブジェクトをメモリに保持しない）
+    # 書き込み専用のシートでは、列幅や固定表示は行を追加する前に設定しておく必要がある
+    wb = Workbook(write_only=True)
 
-    # サマリーシート
-    ws_summary = wb.active
-    ws_summary.title = "検索結果サマリー"
-    ws_summary.append(["検索ワード", "ヒット数", "該当ファイル数"])
+    # スタイルは最初に1度だけ生成し、各セルには同じオブジェクトを割り当てる
+    # ヘッダー行のスタイル - より目立つ背景色を設定
+    header_fill = PatternFill(start_color="66CCFF", end_color="66CCFF", fill_type="solid")
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    wrap_alignment = Alignment(wrap_text=True, vertical='top')
 
-    for keyword, data in results.items():
-        ws_summary.append([keyword, data['hit_count'], data['file_count']])
+    # 背景色の定義 (コントラストを高めた色)
+    color_a1 = "BBDEFB"  # より濃い青
+    color_a2 = "E3F2FD"  # 薄い青
+    color_b1 = "FFCC80"  # より濃いオレンジ
+    color_b2 = "FFF3E0"  # 薄いオレンジ
+    fills = {
+        color: PatternFill(start_color=color, end_color=color, fill_type="solid")
+        for color in (color_a1, color_a2, color_b1, color_b2)
+    }
+
+    # 行の区切りは各行の下罫線だけで引く。罫線は (下罫線, 列の位置) ごとに用意し、
+    # 左端と右端の列には太い縦罫線を加える
+    # 見出しの下の細い罫線は、詳細行が2行以上ある場合だけ引く（詳細行が1行以下の場合、
+    # その行の罫線は最後の行の太い下罫線だけになり、見出しの下には罫線が引かれないため）
+    sides = {style: Side(border_style=style) for style in ("thin", "medium")}
+    header_border = Border(bottom=sides["thin"])
+    borders = {}
+    for bottom in ("thin", "medium"):
+        borders[(bottom, 'left')] = Border(left=sides["medium"], bottom=sides[bottom])
+        borders[(bottom, 'middle')] = Border(bottom=sides[bottom])
+        borders[(bottom, 'right')] = Border(right=sides["medium"], bottom=sides[bottom])
+
+    # サマリーシート
+    ws_summary = wb.create_sheet(title="検索結果サマリー")
 
     # 列幅を固定サイズに設定（px単位をEMU単位に変換: 1px ≈ 0.14インチ）
     # Excelの列幅は文字数単位なので、およそ1文字7ピクセル程度で換算
@@ -243,194 +887,240 @@ def save_results_to_excel(output_excel, results, excel_data):
     ws_summary.column_dimensions['B'].width = 80 / 7   # 80px ≈ 11.4文字
     ws_summary.column_dimensions['C'].width = 100 / 7  # 100px ≈ 14.3文字
 
-    # データを中央揃えに設定
-    for row in ws_summary.iter_rows(min_row=2):
-        for cell in row:
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-    # ヘッダー行のスタイル - より目立つ背景色を設定
-    header_fill = PatternFill(start_color="66CCFF", end_color="66CCFF", fill_type="solid")
-    for cell in ws_summary[1]:
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-        
     # 1行目を固定表示（スクロール時に常に表示）
     ws_summary.freeze_panes = "A2"
 
+    header_cells = []
+    for value in ["検索ワード", "ヒット数", "該当ファイル数"]:
+        cell = WriteOnlyCell(ws_summary, value=value)
+        cell.fill = header_fill
+        cell.alignment = center_alignment
+        header_cells.append(cell)
+    ws_summary.append(header_cells)
+
     # 詳細シート
     ws_details = wb.create_sheet(title="検索結果詳細")
-    ws_details.append(["検索ワード", "ファイル", "行番号", "ヒットした行", "前後2行を含む全文"])
+
+    # 見出しの罫線を決めるため、詳細行を先頭の2行だけ先読みする
+    excel_rows = iter(excel_rows)
+    first_rows = list(itertools.islice(excel_rows, 2))
+    excel_rows = itertools.chain(first_rows, excel_rows)
 
     # カラムの幅を事前に設定
     ws_details.column_dimensions['A'].width = 15  # 検索ワード
     ws_details.column_dimensions['B'].width = 30  # ファイル
     ws_details.column_dimensions['C'].width = 10  # 行番号
     ws_details.column_dimensions['D'].width = 40  # ヒットした行
-    ws_details.column_dimensions['E'].width = 80  # 前後2行を含む全文 - 十分な幅を確保
+    ws_details.column_dimensions['E'].width = 80  # 前後2行を含む全文 - 十分な幅を確保（最低60）
 
-    # ヘッダー行のスタイル - より目立つ背景色を設定
-    header_fill = PatternFill(start_color="66CCFF", end_color="66CCFF", fill_type="solid")
-    for cell in ws_details[1]:
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        
     # 1行目を固定表示（スクロール時に常に表示）
     ws_details.freeze_panes = "A2"
 
-    # データをB列（ファイル）とA列（検索ワード）で昇順ソート
-    sorted_excel_data = sorted(excel_data, key=lambda x: (x[1], x[0]))
+    header_cells = []
+    for value in ["検索ワード", "ファイル", "行番号", "ヒットした行", "前後2行を含む全文"]:
+        cell = WriteOnlyCell(ws_details, value=value)
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        if len(first_rows) >= 2:
+            cell.border = header_border
+        header_cells.append(cell)
+    ws_details.append(header_cells)
 
-    # 色付けのための準備
-    # ファイルとキーワードの組み合わせごとに一意の色を割り当てる
-    file_colors = {}     # ファイルごとの色を管理
-    keyword_colors = {}  # ファイル内のキーワードごとの色を管理
-    
-    # 背景色の定義 (コントラストを高めた色)
-    color_a1 = "BBDEFB"  # より濃い青
-    color_a2 = "E3F2FD"  # 薄い青
-    color_b1 = "FFCC80"  # より濃いオレンジ
-    color_b2 = "FFF3E0"  # 薄いオレンジ
-    
-    # 最初にソートされたデータから一意のファイルとキーワードの組み合わせを抽出し、色を割り当てる
-    current_file = None
-    file_toggle = False
-    
-    for row_data in sorted_excel_data:
-        keyword = row_data[0]
-        file_path = row_data[1]
-        
-        # 新しいファイルが出現したら色をトグル
-        if file_path != current_file:
-            current_file = file_path
-            file_toggle = not file_toggle
-            file_colors[file_path] = color_a1 if file_toggle else color_a2
-            keyword_colors[file_path] = {}
-            current_keyword_toggle = False
-        
-        # このファイル内でのキーワードの色を設定
-        if keyword not in keyword_colors[file_path]:
-            current_keyword_toggle = not current_keyword_toggle
-            keyword_colors[file_path][keyword] = color_b1 if current_keyword_toggle else color_b2
-    
-    # データを追加して色付け
-    current_file = None
-    current_keyword = None
-    
-    for row_idx, row_data in enumerate(sorted_excel_data, start=2):
-        ws_details.append(row_data)
-        
-        keyword = row_data[0]
-        file_path = row_data[1]
-        
-        # 罫線を引く条件の判定
-        border_type = "thin"  # デフォルトは細い罫線
-        
-        # ファイルが変わる場合
-        if current_file is not None and file_path != current_file:
-            border_type = "medium"  # ファイルが変わる場合は太い罫線
-            current_keyword = None  # ファイルが変わったらキーワードもリセット
-        # 同じファイル内でキーワードが変わる場合
-        elif current_keyword is not None and keyword != current_keyword and current_file == file_path:
-            border_type = "thin"  # キーワードが変わる場合は細い罫線
-        
-        # 前の行に下罫線を引く（最初の行以外）
-        if row_idx > 2:
-            for col in range(1, 6):
-                cell = ws_details.cell(row=row_idx-1, column=col)
-                current_border = cell.border
-                
-                # 既存の罫線情報を保持
-                left_border = current_border.left if current_border and current_border.left else Side(border_style=None)
-                right_border = current_border.right if current_border and current_border.right else Side(border_style=None)
-                top_border = current_border.top if current_border and current_border.top else Side(border_style=None)
-                
-                # 左端と右端の列は特別扱い
-                if col == 1:
-                    left_border = Side(border_style="medium")
-                elif col == 5:
-                    right_border = Side(border_style="medium")
-                
-                # 下罫線を設定
-                cell.border = Border(
-                    left=left_border,
-                    right=right_border,
-                    top=top_border,
-                    bottom=Side(border_style=border_type)
-                )
-        
-        # 現在の行に上罫線を引く
-        for col in range(1, 6):
-            cell = ws_details.cell(row=row_idx, column=col)
-            
-            # 左端と右端の列は特別扱い
-            if col == 1:
-                cell.border = Border(
-                    left=Side(border_style="medium"),
-                    top=Side(border_style=border_type)
-                )
-            elif col == 5:
-                cell.border = Border(
-                    right=Side(border_style="medium"),
-                    top=Side(border_style=border_type)
-                )
-            else:
-                cell.border = Border(
-                    top=Side(border_style=border_type)
-                )
-        
-        current_file = file_path
-        current_keyword = keyword
-        
-        # A～D列の設定
-        for col_idx in range(1, 5):
-            cell = ws_details.cell(row=row_idx, column=col_idx)
-            # 中央揃え、上下中央揃えの設定
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            # B列の背景色を設定（ファイル）
-            if col_idx == 2:
-                cell.fill = PatternFill(
-                    start_color=file_colors[file_path],
-                    end_color=file_colors[file_path],
-                    fill_type="solid"
-                )
-            # A列の背景色を設定（キーワード）
-            elif col_idx == 1:
-                cell.fill = PatternFill(
-                    start_color=keyword_colors[file_path][keyword],
-                    end_color=keyword_colors[file_path][keyword],
-                    fill_type="solid"
-                )
-        
-        # E列のセルに折り返し設定を適用（左揃え、上揃えのまま）
-        cell = ws_details.cell(row=row_idx, column=5)
-        cell.alignment = Alignment(wrap_text=True, vertical='top')
-    
-    # 最後の行の下罫線
-    if len(sorted_excel_data) > 0:
-        last_row = len(sorted_excel_data) + 1
-        for col in range(1, 6):
-            cell = ws_details.cell(row=last_row, column=col)
-            if col == 1:
-                cell.border = Border(left=Side(border_style="medium"), bottom=Side(border_style="medium"))
-            elif col == 5:
-                cell.border = Border(right=Side(border_style="medium"), bottom=Side(border_style="medium"))
-            else:
-                cell.border = Border(bottom=Side(border_style="medium"))
+    # 詳細シートのデータ行は openpyxl のセルを経由せず、シートの XML を一時ファイルへ直接書き出す
+    # 書式は (下罫線, キーワードの色, ファイルの色) の組み合わせごとに、列ごとの書式番号として登録しておく
+    # 行ごとの処理を減らすため、列名と共有文字列テーブルを使うかどうかも列ごとに組にしておく
+    # （ファイルパスやキーワード（A列、B列）は多くの行で繰り返されるため共有文字列テーブルにまとめる。
+    # ヒットした行と前後の全文はほぼ重複しないため、テーブルに溜めずにセルへ直接書き込む）
+    row_styles = {}
+    for bottom in ("thin", "medium"):
+        for keyword_toggle in (True, False):
+            for file_toggle in (True, False):
+                middle_style = get_style_id(ws_details, borders[(bottom, 'middle')], center_alignment)
+                style_ids = [
+                    # A列の背景色を設定（キーワード）
+                    get_style_id(ws_details, borders[(bottom, 'left')], center_alignment,
+                                 fills[color_b1 if keyword_toggle else color_b2]),
+                    # B列の背景色を設定（ファイル）
+                    get_style_id(ws_details, borders[(bottom, 'middle')], center_alignment,
+                                 fills[color_a1 if file_toggle else color_a2]),
+                    middle_style,
+                    middle_style,
+                    # E列は折り返し表示（左揃え、上揃え）
+                    get_style_id(ws_details, borders[(bottom, 'right')], wrap_alignment),
+                ]
+                row_styles[(bottom, keyword_toggle, file_toggle)] = [
+                    (get_column_letter(col_idx), style_id, col_idx <= 2)
+                    for col_idx, style_id in enumerate(style_ids, start=1)
+                ]
 
-    # 保存前に列幅を再確認（自動調整からの最小幅を保証）
-    for col in range(1, 6):
-        col_letter = get_column_letter(col)
-        current_width = ws_details.column_dimensions[col_letter].width
-        if col == 5:  # E列は最低60の幅を確保
-            ws_details.column_dimensions[col_letter].width = max(current_width, 60)
+    # 共有文字列テーブル（文字列 -> 登録番号）
+    shared_strings = {}
 
-    try:
-        # 保存
-        wb.save(output_excel)
-        print(f"検索結果を Excelファイル '{output_excel}' に保存しました。")
-    except Exception as e:
-        print(f"エクセルファイルの保存中にエラーが発生しました: {e}")
+    with tempfile.TemporaryFile() as rows_file:
+        # データを追加して色付け
+        # データはファイルとキーワードの順に並んでいるため、直前の行と比べて色を切り替える
+        current_file = None
+        current_keyword = None
+        file_toggle = False
+        keyword_toggle = False
+        write = rows_file.write
+
+        for row_idx, (row_data, bottom_type) in enumerate(iter_with_bottom_types(excel_rows), start=2):
+            keyword = row_data[0]
+            file_path = row_data[1]
+
+            # 新しいファイルが出現したら色をトグルし、キーワードの色は最初から割り当て直す
+            if file_path != current_file:
+                current_file = file_path
+                current_keyword = None
+                file_toggle = not file_toggle
+                keyword_toggle = False
+
+            # このファイル内で新しいキーワードが出現したら色をトグル
+            if keyword != current_keyword:
+                current_keyword = keyword
+                keyword_toggle = not keyword_toggle
+
+            cell_styles = row_styles[(bottom_type, keyword_toggle, file_toggle)]
+            write(sheet_row_xml(row_idx, row_data, cell_styles, shared_strings).encode('utf-8'))
+
+        # サマリーシートのデータは詳細行をすべて書き出して集計が揃ってから追加する
+        # データを中央揃えに設定
+        for keyword, data in results.items():
+            row_cells = []
+            for value in [keyword, data['hit_count'], data['file_count']]:
+                cell = WriteOnlyCell(ws_summary, value=value)
+                cell.alignment = center_alignment
+                row_cells.append(cell)
+            ws_summary.append(row_cells)
+
+        try:
+            # 保存
+            save_workbook_with_rows(wb, ws_details, rows_file, shared_strings, output_excel)
+            print(f"検索結果を Excelファイル '{output_excel}' に保存しました。")
+        except Exception as e:
+            print(f"エクセルファイルの保存中にエラーが発生しました: {e}")
+
+def iter_with_bottom_types(excel_rows):
+    """
+    詳細行を (行, 下罫線の種類) として列挙する（次の行を1行だけ先読みする）
+
+    次の行でファイルが変わる場合と最後の行は太い罫線、それ以外（キーワードが変わる場合を含む）は細い罫線とする。
+
+    :param excel_rows: ファイルパスの順に並んだ詳細行の列挙
+    """
+    rows = iter(excel_rows)
+    row_data = next(rows, None)
+    while row_data is not None:
+        next_row = next(rows, None)
+        yield row_data, "medium" if next_row is None or next_row[1] != row_data[1] else "thin"
+        row_data = next_row
+
+def get_style_id(worksheet, border, alignment, fill=None):
+    """
+    書式をブックに登録し、シートの XML のセル（c 要素）の s 属性に指定する書式番号を返す
+
+    :param worksheet: 書式を登録するブックのシート
+    :param border: 罫線
+    :param alignment: 配置
+    :param fill: 背景色（None の場合は塗りつぶしなし）
+    """
+    cell = WriteOnlyCell(worksheet)
+    cell.border = border
+    cell.alignment = alignment
+    if fill is not None:
+        cell.fill = fill
+    return cell.style_id
+
+def sheet_row_xml(row_idx, values, cell_styles, shared_strings):
+    """
+    1行分のシートの XML（row 要素）を組み立てる
+
+    :param row_idx: 行番号（1から始まる）
+    :param values: セルの値のリスト（文字列または数値）
+    :param cell_styles: 列ごとの (列名, get_style_id で登録した書式番号, 共有文字列テーブルを使うかどうか)
+    :param shared_strings: 共有文字列テーブル（文字列 -> 登録番号）。未登録の文字列はここに追加する
+    """
+    cells = []
+    for value, (column, style_id, shared) in zip(values, cell_styles):
+        ref = f"{column}{row_idx}"
+        if isinstance(value, str) and shared:
+            string_idx = shared_strings.setdefault(value, len(shared_strings))
+            cells.append(f'<c r="{ref}" s="{style_id}" t="s"><v>{string_idx}</v></c>')
+        elif isinstance(value, str):
+            # Excel に書き込めない制御文字は取り除く
+            text = escape(ILLEGAL_CHARACTERS_RE.sub('', value))
+            cells.append(f'<c r="{ref}" s="{style_id}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+        else:
+            cells.append(f'<c r="{ref}" s="{style_id}"><v>{value}</v></c>')
+    return f'<row r="{row_idx}">{"".join(cells)}</row>'
+
+def shared_strings_xml(shared_strings):
+    """
+    共有文字列テーブルの XML（xl/sharedStrings.xml）を組み立てる
+
+    :param shared_strings: 共有文字列テーブル（文字列 -> 登録番号、登録順に並んでいること）
+    """
+    # Excel に書き込めない制御文字は取り除く
+    items = ''.join(
+        f'<si><t xml:space="preserve">{escape(ILLEGAL_CHARACTERS_RE.sub("", value))}</t></si>'
+        for value in shared_strings
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<sst xmlns="{SHEET_MAIN_NS}" uniqueCount="{len(shared_strings)}">'
+        f'{items}</sst>'
+    )
+
+def save_workbook_with_rows(wb, worksheet, rows_file, shared_strings, output_excel):
+    """
+    openpyxl で保存したブックのシートに、別途書き出した行の XML を差し込んで保存する
+
+    :param wb: 保存するブック（シートのヘッダー行や列幅、書式は openpyxl で設定しておく）
+    :param worksheet: 行を差し込むシート
+    :param rows_file: sheet_row_xml で組み立てた行を書き出したファイル
+    :param shared_strings: 行が参照する共有文字列テーブル
+    :param output_excel: 保存する Excel ファイル名
+    """
+    workbook_file = io.BytesIO()
+    wb.save(workbook_file)
+    sheet_name = worksheet.path.lstrip('/')
+
+    rows_size = rows_file.seek(0, io.SEEK_END)
+    rows_file.seek(0)
+
+    with zipfile.ZipFile(workbook_file) as src:
+        # openpyxl が共有文字列テーブルを書き出している場合は、パーツや関連付けが重複するため保存しない
+        # （openpyxl 3.1 の書き込み専用モードはセルに文字列を直接書き込み、共有文字列テーブルを作らない）
+        if SHARED_STRINGS_PART in src.namelist():
+            raise ValueError(f"openpyxl が書き出したブックに既に {SHARED_STRINGS_PART} があります")
+
+        with zipfile.ZipFile(output_excel, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                data = src.read(info.filename)
+                if info.filename == '[Content_Types].xml':
+                    # 共有文字列テーブルのパーツを登録する
+                    data = data.replace(b'</Types>', SHARED_STRINGS_CONTENT_TYPE.encode('utf-8') + b'</Types>')
+                elif info.filename == 'xl/_rels/workbook.xml.rels':
+                    # ブックから共有文字列テーブルへの関連付けを追加する（既存の関連付けと番号が重ならないようにする）
+                    rel_id = data.count(b'<Relationship ') + 1
+                    while f'Id="rId{rel_id}"'.encode('ascii') in data:
+                        rel_id += 1
+                    rel = SHARED_STRINGS_RELATIONSHIP.format(rel_id=rel_id)
+                    data = data.replace(b'</Relationships>', rel.encode('utf-8') + b'</Relationships>')
+
+                if info.filename != sheet_name:
+                    dst.writestr(info, data)
+                    continue
+
+                # シートの XML の sheetData 要素の末尾（ヘッダー行の後ろ）に行を流し込む
+                head, tail = data.split(b'</sheetData>', 1)
+                with dst.open(sheet_name, 'w', force_zip64=rows_size > zipfile.ZIP64_LIMIT) as sheet_file:
+                    sheet_file.write(head)
+                    shutil.copyfileobj(rows_file, sheet_file)
+                    sheet_file.write(b'</sheetData>' + tail)
+
+            dst.writestr(SHARED_STRINGS_PART, shared_strings_xml(shared_strings))
 
 def draw_border_around_group(worksheet, start_row, end_row):
     """
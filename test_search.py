@@ -0,0 +1,132 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import openpyxl
+
+import search
+
+
+def scan_text(text, keywords, ignore_case=True):
+    """text を一時ファイルに書き出して scan_file で検索し、(キーワード, 行番号, ヒットした行) のリストを返す"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'sample.txt')
+        with open(file_path, 'wb') as f:
+            f.write(text.encode('utf-8'))
+        matcher = search.build_matcher(keywords, ignore_case)
+        return [(keywords[idx], line_no, hit_line)
+                for idx, line_no, hit_line, _ in search.scan_file(file_path, matcher)]
+
+
+class IgnoreCaseTest(unittest.TestCase):
+    def test_full_width_keyword(self):
+        hits = scan_text('ok\nＥＲＲＯＲ here\n', ['ｅｒｒｏｒ'])
+        self.assertEqual(hits, [('ｅｒｒｏｒ', 2, 'ＥＲＲＯＲ here')])
+
+    def test_accented_keyword(self):
+        hits = scan_text('École\nécoles\n', ['école'])
+        self.assertEqual(hits, [('école', 1, 'École')])
+
+    def test_case_sensitive_non_ascii_keyword(self):
+        self.assertEqual(scan_text('École\n', ['école'], ignore_case=False), [])
+
+    def test_mixed_with_ascii_keywords(self):
+        hits = scan_text('Error ＥＲＲＯＲ\nerrors\n', ['error', 'ｅｒｒｏｒ'])
+        self.assertEqual(hits, [('error', 1, 'Error ＥＲＲＯＲ'), ('ｅｒｒｏｒ', 1, 'Error ＥＲＲＯＲ')])
+
+
+class LineBreakTest(unittest.TestCase):
+    def test_carriage_return_line_endings(self):
+        hits = scan_text('one\rtwo foo\rthree\r', ['foo'])
+        self.assertEqual(hits, [('foo', 2, 'two foo')])
+
+    def test_mixed_line_endings(self):
+        hits = scan_text('a\r\nb\rc foo\nd\r\n', ['foo'])
+        self.assertEqual(hits, [('foo', 3, 'c foo')])
+
+
+class SaveResultsToExcelTest(unittest.TestCase):
+    def save_and_load(self, results, excel_rows):
+        """save_results_to_excel で保存したブックを openpyxl で読み直す"""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        output_excel = os.path.join(tmp_dir.name, 'result.xlsx')
+        with contextlib.redirect_stdout(io.StringIO()):
+            search.save_results_to_excel(output_excel, results, iter(excel_rows))
+        return openpyxl.load_workbook(output_excel)
+
+    def test_round_trip(self):
+        results = {
+            'foo': {'hit_count': 2, 'file_count': 1, 'files': {}},
+            '<&>': {'hit_count': 1, 'file_count': 1, 'files': {}},
+        }
+        excel_rows = [
+            ['<&>', 'a&b.txt', 1, '  x <&> y', 'ctrl\x01char\n  x <&> y'],
+            ['foo', 'a&b.txt', 3, '  foo', '  foo'],
+            ['foo', 'a&b.txt', 7, 'foo bar', 'foo bar'],
+            ['foo', 'dir/<c>.txt', 2, 'foo', 'foo'],
+        ]
+        wb = self.save_and_load(results, excel_rows)
+        self.assertEqual(wb.sheetnames, ['検索結果サマリー', '検索結果詳細'])
+
+        summary = wb['検索結果サマリー']
+        self.assertEqual([[cell.value for cell in row] for row in summary.iter_rows()], [
+            ['検索ワード', 'ヒット数', '該当ファイル数'],
+            ['foo', 2, 1],
+            ['<&>', 1, 1],
+        ])
+
+        details = wb['検索結果詳細']
+        rows = list(details.iter_rows())
+        # 制御文字は取り除かれ、先頭の空白や XML の特殊文字はそのまま残る
+        self.assertEqual([[cell.value for cell in row] for row in rows[1:]], [
+            ['<&>', 'a&b.txt', 1, '  x <&> y', 'ctrlchar\n  x <&> y'],
+            ['foo', 'a&b.txt', 3, '  foo', '  foo'],
+            ['foo', 'a&b.txt', 7, 'foo bar', 'foo bar'],
+            ['foo', 'dir/<c>.txt', 2, 'foo', 'foo'],
+        ])
+        self.assertEqual(rows[0][0].value, '検索ワード')
+        self.assertEqual(rows[0][0].fill.fgColor.rgb, '0066CCFF')
+        self.assertEqual(rows[0][0].border.bottom.style, 'thin')
+        self.assertEqual(details.freeze_panes, 'A2')
+
+        # A列はファイル内のキーワードごと、B列はファイルごとに背景色を切り替える
+        self.assertEqual([row[0].fill.fgColor.rgb for row in rows[1:]],
+                         ['00FFCC80', '00FFF3E0', '00FFF3E0', '00FFCC80'])
+        self.assertEqual([row[1].fill.fgColor.rgb for row in rows[1:]],
+                         ['00BBDEFB', '00BBDEFB', '00BBDEFB', '00E3F2FD'])
+
+        # ファイルの区切りと最後の行は太い下罫線、それ以外は細い下罫線
+        self.assertEqual([row[2].border.bottom.style for row in rows[1:]],
+                         ['thin', 'thin', 'medium', 'medium'])
+        for row in rows[1:]:
+            self.assertEqual(row[0].border.left.style, 'medium')
+            self.assertEqual(row[4].border.right.style, 'medium')
+            self.assertTrue(row[4].alignment.wrap_text)
+
+    def test_no_hits(self):
+        results = {'foo': {'hit_count': 0, 'file_count': 0, 'files': {}}}
+        wb = self.save_and_load(results, [])
+        details = wb['検索結果詳細']
+        self.assertEqual(details.max_row, 1)
+        self.assertIsNone(details['A1'].border.bottom.style)
+        self.assertEqual([row[0].value for row in wb['検索結果サマリー'].iter_rows()], ['検索ワード', 'foo'])
+
+    def test_existing_shared_strings_part(self):
+        # openpyxl が共有文字列テーブルを書き出した場合を、既存のパーツ名に差し替えて再現する
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(title='sheet')
+        ws.append(['header'])
+        with tempfile.TemporaryDirectory() as tmp_dir, tempfile.TemporaryFile() as rows_file:
+            output_excel = os.path.join(tmp_dir, 'result.xlsx')
+            with mock.patch.object(search, 'SHARED_STRINGS_PART', 'xl/styles.xml'):
+                with self.assertRaises(ValueError):
+                    search.save_workbook_with_rows(wb, ws, rows_file, {}, output_excel)
+            self.assertFalse(os.path.exists(output_excel))
+
+
+if __name__ == '__main__':
+    unittest.main()